@@ -6,71 +6,158 @@ web front‑end displays a live feed of whale transactions, periodic summary
 statistics, and new block notifications.
 """
 
+import itertools
 import json
+import math
 import os
-import queue
 import threading
 import time
-from datetime import datetime
-from typing import Dict, List, Tuple, Optional, Union, Any
+from collections import deque
+from typing import Deque, Dict, List, Tuple, Optional, Union, Any
 
-from flask import Flask, render_template, Response, request, stream_with_context
+from flask import Flask, render_template, Response, request
 
 from whalewatch_core import WhaleWatch
 
+try:
+    from orjson import dumps as json_dumps, loads as json_loads
+except ImportError:  # orjson is optional; fall back to compact stdlib output
+    from json import loads as json_loads
+
+    def json_dumps(data: Any) -> bytes:
+        return json.dumps(data, separators=(",", ":")).encode()
+
 
 app = Flask(__name__, template_folder="templates", static_folder="static")
 
 # Global reference to the WhaleWatch instance; will be created when the server starts
 watcher: Optional[WhaleWatch] = None
 
-# List of queues for connected SSE clients.  Each client has its own queue
-# so that events are delivered independently.  Access to this list must be
-# synchronized.
-client_queues: List[queue.Queue] = []
+
+def format_event(event_type: str, data: Any) -> bytes:
+    """Encode an event as a complete SSE frame."""
+    return b"event: %b\ndata: %b\n\n" % (event_type.encode(), json_dumps(data))
+
+
+HELLO_FRAME = format_event("hello", {})
+BACKPRESSURE_FRAME = format_event("backpressure", {})
+KEEPALIVE_FRAME = b": keepalive\n\n"
+# Seconds between keepalive comments pushed to every client
+KEEPALIVE_INTERVAL = 15
+
+
+class ClientChannel:
+    """Per-client event buffer that coalesces state events under backpressure.
+
+    Events arrive as pre-encoded SSE frames.  ``whale_batch`` and ``block``
+    frames are queued in a bounded deque that drops the oldest entry when
+    full.  ``summary`` and ``config`` events only matter in their latest form,
+    so each occupies a single slot that newer events overwrite; keepalives
+    are collapsed the same way.
+    ``deque.append``/``popleft`` and ``dict`` stores/pops are atomic under the
+    GIL, so producers and the consumer share no mutex.
+    """
+
+    COALESCED = ("summary", "config", "keepalive")
+
+    def __init__(self, maxlen: int = 100) -> None:
+        self.events: Deque[bytes] = deque(maxlen=maxlen)
+        # Latest summary/config frame keyed by event type
+        self._latest: Dict[str, bytes] = {}
+        # Set when an event had to be discarded since the last drain
+        self.backpressure = False
+        # Set by producers once new data is available so an idle consumer
+        # can sleep instead of spinning.
+        self.ready = threading.Event()
+
+    def offer(self, event_type: str, frame: bytes) -> None:
+        """Queue a frame, coalescing state events and dropping the oldest."""
+        if event_type in self.COALESCED:
+            self._latest[event_type] = frame
+        else:
+            if len(self.events) == self.events.maxlen:
+                self.backpressure = True
+            self.events.append(frame)
+        if not self.ready.is_set():
+            self.ready.set()
+
+    def drain(self) -> List[bytes]:
+        """Return all pending frames, state snapshots ahead of queued events."""
+        pending: List[bytes] = []
+        if self.backpressure:
+            self.backpressure = False
+            pending.append(BACKPRESSURE_FRAME)
+        for event_type in self.COALESCED:
+            frame = self._latest.pop(event_type, None)
+            if frame is not None:
+                pending.append(frame)
+        events = self.events
+        while events:
+            try:
+                pending.append(events.popleft())
+            except IndexError:
+                break
+        return pending
+
+
+# Event channels for connected SSE clients, keyed by a monotonically
+# increasing client id.  Each client has its own channel so that events are
+# delivered independently.  Access to this mapping must be synchronized.
+client_queues: Dict[int, ClientChannel] = {}
 client_lock = threading.Lock()
+_next_client_id = itertools.count()
+
 
+def broadcast_event(event_type: str, data: Union[Dict[str, Any], List[Dict[str, Any]]]) -> None:
+    """Place an event into each connected client's channel."""
+    # Serialize once here rather than once per client in the stream generator
+    _broadcast_frame(event_type, format_event(event_type, data))
 
-def broadcast_event(event_type: str, data: Dict[str, Any]) -> None:
-    """Place an event into each connected client's queue."""
+
+def _broadcast_frame(event_type: str, frame: bytes) -> None:
+    """Offer an already encoded frame to every connected client."""
+    # Hold the client lock only long enough to snapshot the channels
     with client_lock:
-        for q in client_queues:
-            try:
-                q.put((event_type, data), timeout=0.1)
-            except queue.Full:
-                # Skip if queue is full to avoid blocking
-                pass
+        channels = list(client_queues.values())
+    for channel in channels:
+        channel.offer(event_type, frame)
 
 
 @app.route("/stream")
 def stream() -> Response:
     """SSE endpoint providing a continuous stream of JSON events."""
     def gen() -> Any:
-        # Create a new queue for this client
-        q: queue.Queue = queue.Queue(maxsize=100)
+        # Create a new channel for this client
+        channel = ClientChannel()
+        client_id = next(_next_client_id)
         with client_lock:
-            client_queues.append(q)
+            client_queues[client_id] = channel
         try:
             # Send a hello event on connect
-            yield f"event: hello\ndata: {{}}\n\n"
+            yield HELLO_FRAME
             while True:
-                try:
-                    event_type, data = q.get(timeout=1.0)
-                except queue.Empty:
-                    # Send keepalive comment to prevent connection from closing
-                    yield ": keepalive\n\n"
+                pending = channel.drain()
+                if not pending:
+                    # Clear before re-checking so a concurrent offer is not missed
+                    channel.ready.clear()
+                    pending = channel.drain()
+                if not pending:
+                    # Sleep until a producer or the heartbeat thread wakes us
+                    channel.ready.wait()
                     continue
-                # Compose SSE formatted message
-                yield f"event: {event_type}\ndata: {json.dumps(data)}\n\n"
+                yield from pending
         finally:
-            # Remove the queue when client disconnects
+            # Remove the channel when client disconnects
             with client_lock:
-                try:
-                    client_queues.remove(q)
-                except ValueError:
-                    pass
+                client_queues.pop(client_id, None)
 
-    return Response(stream_with_context(gen()), mimetype="text/event-stream")
+    # gen() only touches its channel, so it needs no request context.
+    # X-Accel-Buffering stops nginx-style proxies from buffering the stream.
+    return Response(
+        gen(),
+        mimetype="text/event-stream",
+        headers={"X-Accel-Buffering": "no", "Cache-Control": "no-cache"},
+    )
 
 
 @app.route("/")
@@ -164,10 +251,14 @@ def config_endpoint() -> Response:
             "error": "Watcher not initialized",
         }
     if request.method == "POST":
-        try:
-            data = request.get_json(force=True, silent=True) or request.form
-        except Exception:
-            data = request.form
+        data: Any = request.form
+        if request.is_json:
+            try:
+                body = json_loads(request.get_data())
+            except ValueError:
+                body = None
+            if isinstance(body, dict):
+                data = body
         new_threshold = data.get("threshold")
         new_interval = data.get("interval")
         # Convert to float/int if provided
@@ -178,6 +269,9 @@ def config_endpoint() -> Response:
                 threshold_val = float(new_threshold)
         except ValueError:
             pass
+        # NaN/inf cannot be compared in satoshis; keep the current threshold
+        if threshold_val is not None and not math.isfinite(threshold_val):
+            threshold_val = None
         try:
             if new_interval is not None:
                 interval_val = int(new_interval)
@@ -217,14 +311,29 @@ def health_check():
             status = 'healthy' if watcher.is_running() else 'degraded'
         else:
             status = 'starting'
-        return {'status': status, 'timestamp': datetime.now().isoformat()}, 200
+        return {'status': status, 'timestamp': time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())}, 200
     except Exception as e:
         return {'status': 'error', 'error': str(e)}, 500
 
 
+def _heartbeat_loop() -> None:
+    """Push a keepalive comment to all clients to prevent idle disconnects."""
+    while True:
+        time.sleep(KEEPALIVE_INTERVAL)
+        _broadcast_frame("keepalive", KEEPALIVE_FRAME)
+
+
+def start_heartbeat() -> None:
+    """Start the background thread that sends SSE keepalives."""
+    threading.Thread(target=_heartbeat_loop, daemon=True).start()
+
+
 def parse_config() -> Tuple[float, int]:
     """Read whale threshold and interval from environment or defaults."""
     threshold = float(os.environ.get("WHALE_THRESHOLD", "100"))
+    if not math.isfinite(threshold):
+        # NaN/inf cannot be compared in satoshis; fall back to the default
+        threshold = 100.0
     interval = int(os.environ.get("SUMMARY_INTERVAL", "60"))
     return threshold, interval
 
@@ -239,10 +348,13 @@ def start_watcher() -> WhaleWatch:
 # For production deployment with Gunicorn, the watcher needs to be started
 # when the app is loaded, not just when __name__ == "__main__"
 # This ensures the background thread is running when Gunicorn workers start.
+# start.sh runs a single gevent worker, so the watcher's threads and every
+# SSE client are cooperative greenlets sharing this process.
 def initialize_watcher():
     global watcher
     if watcher is None:
         watcher = start_watcher()
+        start_heartbeat()
 
 # Initialize watcher when app starts
 with app.app_context():
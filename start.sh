@@ -1,4 +1,6 @@
 #!/bin/bash
 PORT=${PORT:-8000}
 echo "Starting app on port $PORT"
-exec gunicorn --bind 0.0.0.0:$PORT app:app
+# One gevent worker: SSE clients become greenlets instead of blocked threads,
+# and the watcher plus all client channels stay in a single process.
+exec gunicorn --bind 0.0.0.0:$PORT --worker-class gevent --workers 1 --worker-connections 1000 app:app
@@ -1166,10 +1166,10 @@ evtSource.addEventListener("summary", (evt) => {
     updateLastUpdate();
 });
 
-// Handle whale events
-evtSource.addEventListener("whale", (evt) => {
-    const data = JSON.parse(evt.data);
-    addWhaleTransaction(data);
+// Handle whale events, delivered in batches
+evtSource.addEventListener("whale_batch", (evt) => {
+    const whales = JSON.parse(evt.data);
+    whales.forEach(addWhaleTransaction);
     state.lastUpdateTime = Date.now();
     updateLastUpdate();
 });
@@ -1195,6 +1195,12 @@ evtSource.addEventListener("block", (evt) => {
     updateLastUpdate();
 });
 
+// Handle backpressure events: the server dropped or coalesced updates
+evtSource.addEventListener("backpressure", () => {
+    console.warn("Event stream fell behind; resyncing configuration");
+    fetchConfig();
+});
+
 // Handle config events
 evtSource.addEventListener("config", (evt) => {
     const data = JSON.parse(evt.data);
@@ -8,14 +8,32 @@ version of WhaleWatch, but removed console printing and instead exposes
 events via callbacks.
 """
 
-import json
+import socket
 import threading
 import time
-from datetime import datetime
-from typing import Callable, Dict, List, Optional, Tuple
+from operator import itemgetter
+from typing import Callable, Dict, List, Optional, Tuple, Union
 
 import requests
 import websocket
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from orjson import loads as json_loads
+except ImportError:  # orjson is optional; fall back to the stdlib parser
+    from json import loads as json_loads
+
+
+# Divisor converting satoshis multiplied by USD cents into whole USD
+SAT_CENTS_PER_USD = 10_000_000_000
+
+# Shortest accepted summary interval in seconds; anything lower is clamped so
+# the summary loop always sleeps between cycles
+MIN_SUMMARY_INTERVAL = 1
+
+# Reads an output's value inside ``map`` so the summation loop stays in C
+_output_value = itemgetter("value")
 
 
 class WhaleWatch:
@@ -24,11 +42,14 @@ class WhaleWatch:
     This version accepts callback functions to report events to a web
     interface or other consumer.  Callback functions receive two
     positional arguments: ``event_type`` (a string) and ``data`` (a
-    dictionary).  Supported event types are:
+    dictionary, or a list of dictionaries for batched events).  Supported
+    event types are:
 
-    * ``"whale"`` – a transaction exceeding the configured threshold
-      was detected.  The data dictionary contains keys ``hash``,
-      ``value_btc``, ``value_usd``, ``timestamp`` and ``address``.
+    * ``"whale_batch"`` – one or more transactions exceeding the
+      configured threshold were detected in the same batch of WebSocket
+      messages.  The data is a list of dictionaries, each containing keys
+      ``hash``, ``value_btc``, ``value_usd``, ``timestamp`` and
+      ``address``.
     * ``"summary"`` – a periodic summary of recent activity.  The
       dictionary contains keys ``count``, ``total_btc``, ``avg_btc``,
       ``total_usd``, ``avg_usd``, ``whales`` and ``timestamp``.
@@ -42,7 +63,8 @@ class WhaleWatch:
         Minimum transaction value in BTC to classify a transaction as a
         whale.  Default is 100 BTC.
     summary_interval: int, optional
-        Number of seconds between summary events.  Default is 60.
+        Number of seconds between summary events.  Default is 60; values
+        below ``MIN_SUMMARY_INTERVAL`` are clamped to it.
     callback: callable, optional
         A function ``callback(event_type, data)`` that will be invoked
         whenever a whale is detected, a summary is produced, or a new
@@ -53,21 +75,34 @@ class WhaleWatch:
         self,
         threshold_btc: float = 100.0,
         summary_interval: int = 60,
-        callback: Optional[Callable[[str, Dict[str, any]], None]] = None,
+        callback: Optional[Callable[[str, Union[Dict[str, any], List[Dict[str, any]]]], None]] = None,
     ) -> None:
+        # Threshold in satoshis, kept in step with ``threshold_btc`` so the
+        # whale check is an integer comparison.  Converted first so a
+        # non-finite value raises before any state is set.
+        self._threshold_sat = round(threshold_btc * 1e8)
         self.threshold_btc = threshold_btc
-        self.summary_interval = summary_interval
+        self.summary_interval = max(summary_interval, MIN_SUMMARY_INTERVAL)
         self.callback = callback
 
         # Shared state protected by a lock
         self._lock = threading.Lock()
         self._reset_stats()
 
-        # Price caching
-        self._price_usd: Optional[float] = None
+        # Price caching, in integer USD cents (0 until the first fetch).  The
+        # price thread replaces it with a single store, which is atomic under
+        # the GIL, so readers never need the lock.
+        self._price_usd_cents = 0
+        # Persistent HTTP session so price fetches reuse the TLS connection
+        self._http = requests.Session()
+        self._http.headers.update({"Accept-Encoding": "gzip", "User-Agent": "whalewatch/1.0"})
+        retries = Retry(total=3, backoff_factor=1, status_forcelist=(429, 500, 502, 503, 504))
+        self._http.mount("https://", HTTPAdapter(max_retries=retries))
 
         # Thread control flag
         self._stop_event = threading.Event()
+        # Wakes the summary loop when the interval changes or on stop
+        self._config_event = threading.Event()
 
     def _reset_stats(self) -> None:
         """Reset per‑interval statistics."""
@@ -83,7 +118,7 @@ class WhaleWatch:
             "&vs_currencies=usd"
         )
         try:
-            resp = requests.get(url, timeout=10)
+            resp = self._http.get(url, timeout=10)
             if resp.status_code == 200:
                 data = resp.json()
                 return float(data.get("bitcoin", {}).get("usd"))
@@ -96,66 +131,152 @@ class WhaleWatch:
         while not self._stop_event.is_set():
             price = self._fetch_price()
             if price is not None:
-                self._price_usd = price
-            time.sleep(60)
+                self._price_usd_cents = round(price * 100)
+            if self._stop_event.wait(60):
+                break
 
     # ---------------------- WebSocket handlers ----------------------
-    def _on_open(self, ws: websocket.WebSocketApp) -> None:
+    _WS_URL = "wss://ws.blockchain.info/inv"
+    # Frames are drained in batches of at most ``_BATCH_MAX`` messages or
+    # ``_BATCH_WINDOW`` seconds, whichever comes first.
+    _BATCH_MAX = 64
+    _BATCH_WINDOW = 0.05
+    # How long to block waiting for the first frame of a batch, so the stop
+    # flag is checked regularly on a quiet connection.
+    _RECV_TIMEOUT = 1.0
+    _PING_INTERVAL = 30
+    _PING_TIMEOUT = 10
+    # Ask for a 1 MiB receive buffer so bursts and large block frames are
+    # absorbed by the kernel in fewer reads
+    _SOCKOPT = ((socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20),)
+    # Pre-encoded control messages, sent on every (re)connect
+    _SUB_UNCONFIRMED = b'{"op":"unconfirmed_sub"}'
+    _SUB_BLOCKS = b'{"op":"blocks_sub"}'
+    _PING = b'{"op":"ping"}'
+
+    def _on_open(self, ws: websocket.WebSocket) -> None:
         """Subscribe to unconfirmed transactions and new blocks."""
-        ws.send(json.dumps({"op": "unconfirmed_sub"}))
-        ws.send(json.dumps({"op": "blocks_sub"}))
-        ws.send(json.dumps({"op": "ping"}))
+        ws.send(self._SUB_UNCONFIRMED)
+        ws.send(self._SUB_BLOCKS)
+        ws.send(self._PING)
 
-    def _on_message(self, ws: websocket.WebSocketApp, message: str) -> None:
-        """Handle incoming WebSocket messages."""
+    def _recv_batch(self, ws: websocket.WebSocket) -> List[str]:
+        """Wait for one frame, then drain any others arriving within the batch window."""
+        ws.settimeout(self._RECV_TIMEOUT)
         try:
-            data = json.loads(message)
-        except json.JSONDecodeError:
-            return
-        op = data.get("op")
-        if op == "utx":
-            self._handle_unconfirmed_tx(data.get("x", {}))
-        elif op == "block":
-            self._handle_new_block(data.get("x", {}))
-
-    def _handle_unconfirmed_tx(self, tx: Dict[str, any]) -> None:
-        """Process an unconfirmed transaction and trigger whale callback."""
-        outputs: List[Dict[str, any]] = tx.get("out", [])
+            frames = [ws.recv()]
+        except websocket.WebSocketTimeoutException:
+            return []
+        deadline = time.monotonic() + self._BATCH_WINDOW
+        while len(frames) < self._BATCH_MAX:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            ws.settimeout(remaining)
+            try:
+                frames.append(ws.recv())
+            except websocket.WebSocketTimeoutException:
+                break
+        return frames
+
+    def _on_messages(self, messages: List[str]) -> None:
+        """Decode a batch of WebSocket messages and dispatch them together."""
+        # blockchain.info only sends text frames; ignore anything binary
+        messages = [message for message in messages if isinstance(message, str)]
+        try:
+            # Parse the whole batch in one call by wrapping it in a JSON array
+            decoded = json_loads("[" + ",".join(messages) + "]")
+        except ValueError:
+            decoded = None
+        if decoded is None or len(decoded) != len(messages):
+            # A malformed frame spoils the batch, as does one such as ``1,2``
+            # that only parses once joined; fall back to one at a time
+            decoded = []
+            for message in messages:
+                try:
+                    decoded.append(json_loads(message))
+                except ValueError:
+                    continue
+        txs: List[Dict[str, any]] = []
+        blocks: List[Dict[str, any]] = []
+        for data in decoded:
+            if not isinstance(data, dict):
+                continue
+            payload = data.get("x")
+            if not isinstance(payload, dict):
+                continue
+            op = data.get("op")
+            if op == "utx":
+                txs.append(payload)
+            elif op == "block":
+                blocks.append(payload)
+        if txs:
+            self._handle_unconfirmed_txs(txs)
+        for block in blocks:
+            self._handle_new_block(block)
+
+    @staticmethod
+    def _sum_outputs_lenient(outputs: List[Dict[str, any]]) -> int:
+        """Sum output values, skipping missing or malformed entries."""
+        if not isinstance(outputs, list):
+            return 0
         total_sat = 0
         for out in outputs:
             try:
                 total_sat += int(out.get("value", 0))
-            except (TypeError, ValueError):
+            except (AttributeError, TypeError, ValueError):
                 continue
-        total_btc = total_sat / 1e8
-        first_addr = outputs[0].get("addr") if outputs else None
-        timestamp = tx.get("time")
-        tx_hash = tx.get("hash")
-        # Update statistics
+        return total_sat
+
+    def _handle_unconfirmed_txs(self, txs: List[Dict[str, any]]) -> None:
+        """Process a batch of unconfirmed transactions and trigger whale callbacks."""
+        # Every tx needs its full total for the summary counters, so only the
+        # whale-specific fields are deferred until a tx crosses the threshold.
+        totals: List[int] = []
+        for tx in txs:
+            outputs: List[Dict[str, any]] = tx.get("out") or []
+            try:
+                # blockchain.info always sends integer values, so this is the hot path
+                total_sat = sum(map(_output_value, outputs))
+            except (KeyError, TypeError):
+                # A malformed tx only loses its bad outputs, never the batch
+                total_sat = self._sum_outputs_lenient(outputs)
+            totals.append(total_sat)
+        threshold_sat = self._threshold_sat
+        whales = [(tx, total_sat) for tx, total_sat in zip(txs, totals) if total_sat >= threshold_sat]
+        batch_sat = sum(totals)
+        # Update statistics for the whole batch in a single critical section
         with self._lock:
-            self._unconfirmed_count += 1
-            self._total_value_sat += total_sat
-            if total_btc >= self.threshold_btc:
-                self._whale_count += 1
-                # Trigger callback for whales
-                if self.callback is not None:
-                    event_data = {
-                        "hash": tx_hash,
-                        "value_btc": total_btc,
-                        "value_usd": (self._price_usd or 0.0) * total_btc,
-                        "timestamp": timestamp,
-                        "address": first_addr,
-                    }
-                    try:
-                        self.callback("whale", event_data)
-                    except Exception:
-                        pass
+            self._unconfirmed_count += len(totals)
+            self._total_value_sat += batch_sat
+            self._whale_count += len(whales)
+        # Trigger a single callback for all whales in the batch
+        if self.callback is None or not whales:
+            return
+        price_cents = self._price_usd_cents
+        whales_batch: List[Dict[str, any]] = []
+        for tx, total_sat in whales:
+            outputs = tx.get("out") or []
+            first_out = outputs[0] if isinstance(outputs, list) and outputs else None
+            total_btc = total_sat / 1e8
+            whales_batch.append({
+                "hash": tx.get("hash"),
+                "value_btc": total_btc,
+                # satoshis * cents / (1e8 sat/BTC * 100 cents/USD) = USD
+                "value_usd": total_sat * price_cents // SAT_CENTS_PER_USD,
+                "timestamp": tx.get("time"),
+                "address": first_out.get("addr") if isinstance(first_out, dict) else None,
+            })
+        try:
+            self.callback("whale_batch", whales_batch)
+        except Exception:
+            pass
 
     def _handle_new_block(self, block: Dict[str, any]) -> None:
         """Trigger callback for new block events."""
         height = block.get("height")
         n_tx = block.get("nTx")
-        timestamp = datetime.now().timestamp()
+        timestamp = time.time()
         if self.callback is not None:
             event_data = {
                 "height": height,
@@ -167,10 +288,31 @@ class WhaleWatch:
             except Exception:
                 pass
 
+    def _wait_summary_interval(self) -> bool:
+        """Sleep for the summary interval, honouring interval changes.
+
+        The wait is re-evaluated whenever ``_config_event`` fires, so a new
+        interval applies to the cycle already in progress.  Returns ``False``
+        if the watcher was stopped while waiting.
+        """
+        started = time.monotonic()
+        waited = False
+        while True:
+            remaining = started + self.summary_interval - time.monotonic()
+            if remaining <= 0 and waited:
+                return not self._stop_event.is_set()
+            # Always block at least once per cycle so the loop can never spin
+            waited = True
+            if self._config_event.wait(max(remaining, MIN_SUMMARY_INTERVAL)):
+                self._config_event.clear()
+                if self._stop_event.is_set():
+                    return False
+
     def _summary_loop(self) -> None:
         """Produce periodic summary events and reset counters."""
         while not self._stop_event.is_set():
-            time.sleep(self.summary_interval)
+            if not self._wait_summary_interval():
+                break
             with self._lock:
                 count = self._unconfirmed_count
                 total_sat = self._total_value_sat
@@ -180,15 +322,15 @@ class WhaleWatch:
                 continue
             total_btc = total_sat / 1e8
             avg_btc = total_btc / count
-            price = self._price_usd or 0.0
+            total_usd = total_sat * self._price_usd_cents // SAT_CENTS_PER_USD
             event_data = {
                 "count": count,
                 "total_btc": total_btc,
                 "avg_btc": avg_btc,
-                "total_usd": total_btc * price,
-                "avg_usd": avg_btc * price,
+                "total_usd": total_usd,
+                "avg_usd": total_usd / count,
                 "whales": whale_count,
-                "timestamp": datetime.now().timestamp(),
+                "timestamp": time.time(),
             }
             if self.callback is not None:
                 try:
@@ -205,25 +347,29 @@ class WhaleWatch:
         threshold_btc: float
             New threshold in BTC.
         """
+        threshold_sat = round(threshold_btc * 1e8)
         with self._lock:
+            self._threshold_sat = threshold_sat
             self.threshold_btc = threshold_btc
 
     def update_interval(self, summary_interval: int) -> None:
         """Update the summary interval (seconds).
 
-        The new interval will take effect for subsequent cycles of the summary
-        loop.
+        The new interval also applies to the summary cycle already in
+        progress.
 
         Parameters
         ----------
         summary_interval: int
-            New summary interval in seconds.
+            New summary interval in seconds, clamped to at least
+            ``MIN_SUMMARY_INTERVAL``.
         """
         # It is safe to update without a lock because this value is read
         # outside of any lock in the summary loop.  However, we use a lock
         # for consistency.
         with self._lock:
-            self.summary_interval = summary_interval
+            self.summary_interval = max(summary_interval, MIN_SUMMARY_INTERVAL)
+        self._config_event.set()
 
     def update_config(self, threshold_btc: Optional[float] = None, summary_interval: Optional[int] = None) -> None:
         """Update both threshold and summary interval.
@@ -233,31 +379,60 @@ class WhaleWatch:
         threshold_btc: float or None
             If provided, sets the whale detection threshold.
         summary_interval: int or None
-            If provided, sets the summary interval in seconds.
+            If provided, sets the summary interval in seconds, clamped to at
+            least ``MIN_SUMMARY_INTERVAL``.
         """
+        # Convert before taking the lock so a non-finite threshold raises
+        # without leaving the two fields out of step
+        threshold_sat = round(threshold_btc * 1e8) if threshold_btc is not None else None
         with self._lock:
             if threshold_btc is not None:
+                self._threshold_sat = threshold_sat
                 self.threshold_btc = threshold_btc
             if summary_interval is not None:
-                self.summary_interval = summary_interval
+                self.summary_interval = max(summary_interval, MIN_SUMMARY_INTERVAL)
+        if summary_interval is not None:
+            self._config_event.set()
+
+    def _consume(self, ws: websocket.WebSocket) -> None:
+        """Read batches from an open connection until it goes stale or we stop."""
+        last_recv = last_ping = time.monotonic()
+        while not self._stop_event.is_set():
+            frames = self._recv_batch(ws)
+            now = time.monotonic()
+            if frames:
+                last_recv = now
+                self._on_messages(frames)
+            elif now - last_recv > self._PING_INTERVAL + self._PING_TIMEOUT:
+                # Not even a pong since the last ping; reconnect
+                return
+            if now - last_ping >= self._PING_INTERVAL:
+                ws.send(self._PING)
+                last_ping = now
 
     def _run_ws(self) -> None:
         """Run the WebSocket client with reconnection logic."""
         while not self._stop_event.is_set():
+            ws = None
             try:
-                ws = websocket.WebSocketApp(
-                    "wss://ws.blockchain.info/inv",
-                    on_open=self._on_open,
-                    on_message=self._on_message,
-                    on_error=lambda ws, err: None,
-                    on_close=lambda ws: None,
+                ws = websocket.create_connection(
+                    self._WS_URL,
+                    timeout=self._PING_TIMEOUT,
+                    # blockchain.info sends valid UTF-8 JSON; skip the per-frame check
+                    skip_utf8_validation=True,
+                    sockopt=self._SOCKOPT,
                 )
+                self._on_open(ws)
                 # Keep running until error
-                ws.run_forever(ping_interval=30, ping_timeout=10)
+                self._consume(ws)
             except Exception:
                 pass
+            finally:
+                if ws is not None:
+                    ws.close()
             # Brief pause before reconnecting
-            time.sleep(5)
+            if self._stop_event.wait(5):
+                break
 
     def start(self) -> None:
         """Start background threads for price, summary and WebSocket."""
@@ -270,4 +445,5 @@ class WhaleWatch:
 
     def stop(self) -> None:
         """Signal all threads to stop."""
-        self._stop_event.set()
\ No newline at end of file
+        self._stop_event.set()
+        self._config_event.set()
\ No newline at end of file